@@ -1,7 +1,9 @@
 import collections
+import itertools
+import operator
 import random
 from enum import Enum
-from typing import Any, Callable, DefaultDict, List, Set, Tuple, Optional
+from typing import Any, Callable, DefaultDict, Dict, List, Set, Tuple, Optional
 
 from lib.notification import Notification
 
@@ -10,31 +12,51 @@ class Player:
     def __init__(self, name):
         self.id: str = f'player-{name}'
         self.name: str = name
+        self._hash: int = hash(self.id)
+        self._dict: Dict[str, str] = {'id': self.id, 'name': name}
+
+    def __reduce__(self):
+        # str hashes are salted per process, so rebuild rather than restore _hash
+        return (Player, (self.name,))
 
     def __repr__(self) -> str:
         return f"Player(id={self.id}, name={self.name})"
 
     def __hash__(self) -> int:
-        return hash(self.id)
+        return self._hash
 
     def __eq__(self, obj) -> bool:
         return isinstance(obj, type(self)) and self.id == obj.id
 
 
 class Card:
+    COLOR_NAMES = ('red', 'blue', 'green', 'yellow', 'black')
+    COLOR_IDX = {color: i for i, color in enumerate(COLOR_NAMES)}
+    VALUE_IDX = {value: i for i, value in enumerate(
+        [str(i) for i in range(10)] + ['draw-two', 'reverse', 'skip', 'draw-four', 'wild'])}
+    POINTS = {str(i): i for i in range(10)} | {'draw-two': 20, 'reverse': 20, 'skip': 20, 'draw-four': 50, 'wild': 50}
+
     def __init__(self, color, value):
         self.id: str = f'{value}-{color}'
         self.color: str = color
         self.value: str = value
+        # Integer encodings so play checks compare ints instead of strings
+        self.cidx: int = self.COLOR_IDX[color]
+        self.vidx: int = self.VALUE_IDX[value]
+        self.black: bool = color == 'black'
+        self.points: int = self.POINTS[value]
+        # Serialized form, built once since cards never change after construction
+        self._dict: Dict[str, str] = {'id': self.id, 'color': color, 'value': value}
+
+    def __reduce__(self):
+        # Pickle only what is needed to rebuild the card; derived fields are recomputed
+        return (Card, (self.color, self.value))
 
     def is_special(self) -> bool:
-        special_cards = set(Deck.DRAW_TWO_CARDS + Deck.REVERSE_CARDS +
-                            Deck.SKIP_CARDS + Deck.DRAW_FOUR_CARDS + Deck.WILD_CARDS)
-        return self.value in special_cards or self.color == 'black'
+        return self.value in Deck.SPECIAL_VALUES or self.color == 'black'
 
     def is_color_special(self) -> bool:
-        special_cards = set(Deck.DRAW_TWO_CARDS + Deck.REVERSE_CARDS + Deck.SKIP_CARDS)
-        return self.value in special_cards or self.color != 'black'
+        return self.value in Deck.COLOR_SPECIAL_VALUES or self.color != 'black'
 
     def is_black(self) -> bool:
         return self.color == 'black'
@@ -50,30 +72,32 @@ class Card:
 
 
 class Deck:
-    SHUFFLE_FREQ = 50
-    COLORS = ['red', 'blue', 'green', 'yellow']
-    NUMBER_CARDS = [str(i) for i in (list(range(0, 10)) + list(range(1, 10)))]
-    DRAW_TWO_CARDS = ['draw-two'] * 2
-    REVERSE_CARDS = ['reverse'] * 2
-    SKIP_CARDS = ['skip'] * 2
-
-    DRAW_FOUR_CARDS = ['draw-four'] * 4
-    WILD_CARDS = ['wild'] * 4
+    COLORS = ('red', 'blue', 'green', 'yellow')
+    NUMBER_CARDS = tuple(str(i) for i in (list(range(0, 10)) + list(range(1, 10))))
+    DRAW_TWO_CARDS = ('draw-two',) * 2
+    REVERSE_CARDS = ('reverse',) * 2
+    SKIP_CARDS = ('skip',) * 2
+
+    DRAW_FOUR_CARDS = ('draw-four',) * 4
+    WILD_CARDS = ('wild',) * 4
     COLOR_CARDS = NUMBER_CARDS + DRAW_TWO_CARDS + REVERSE_CARDS + SKIP_CARDS
 
-    def __init__(self):
-        color_cards = [Card(color, value) for color in self.COLORS for value in self.COLOR_CARDS]
-        black_cards = [Card('black', value) for value in (self.DRAW_FOUR_CARDS + self.WILD_CARDS)]
+    COLOR_SPECIAL_VALUES = frozenset(DRAW_TWO_CARDS + REVERSE_CARDS + SKIP_CARDS)
+    SPECIAL_VALUES = COLOR_SPECIAL_VALUES | frozenset(DRAW_FOUR_CARDS + WILD_CARDS)
 
-        self.cards: List[Card] = color_cards + black_cards
+    # (color, value) for every card in a full deck
+    CARD_SPECS = tuple(itertools.product(COLORS, COLOR_CARDS)) + \
+        tuple(('black', value) for value in DRAW_FOUR_CARDS + WILD_CARDS)
+
+    def __init__(self):
+        self.cards: List[Card] = [Card(color, value) for color, value in self.CARD_SPECS]
         self.shuffle()
 
     def get_cards(self) -> List[Card]:
         return self.cards
 
     def shuffle(self):
-        for _ in range(self.SHUFFLE_FREQ):
-            random.shuffle(self.cards)
+        random.shuffle(self.cards)
 
 
 class GameOverReason(Enum):
@@ -85,43 +109,59 @@ class GameOverReason(Enum):
 class Game:
     MIN_PLAYERS_ALLOWED = 2
     MAX_PLAYERS_ALLOWED = 2
+    MAX_TURN_STEPS = 2  # skip / two-player reverse
 
     def __init__(self, room: str, players: Set[Player], hand_size: int):
+        # Hands stay lists: card ids are '{value}-{color}' and a hand can hold duplicates
         self.hands: DefaultDict[Player, List[Card]] = collections.defaultdict(list)
-        self.players_list: List[Player] = sorted(list(players), key=lambda p: p.id)
+        self.players_list: List[Player] = sorted(players, key=operator.attrgetter('id'))
         self.players: Set[Player] = set(self.players_list)
+        self.players_by_id: Dict[str, Player] = {p.id: p for p in self.players_list}
+        # Per-player counters kept in step with hands (color_counts is indexed by Card.cidx)
+        self.color_counts: Dict[Player, List[int]] = {p: [0] * len(Card.COLOR_NAMES) for p in self.players_list}
+        self.score_accum: Dict[Player, int] = {p: 0 for p in self.players_list}
         self.current_index: int = 0
         self.direction: int = 1
-        self.current_color: Optional[str] = None
+        self._build_next_table()
+        self.current_color_idx: Optional[int] = None
         # Pending draw penalty state (e.g., from +2 / +4)
         self.pending_draw_count: int = 0
         self.pending_draw_for_index: Optional[int] = None
+        self.room: str = room
         self.notify = Notification(room)
-        self.deck = Deck()
 
         self.validate_players()
 
-        cards = self.deck.get_cards()
+        # The deck is only needed for dealing, so it is not kept on the game
+        cards = Deck().get_cards()
         total_players = len(self.players_list)
         self.remaining_cards: List[Card] = cards[total_players * hand_size:]
         dealt = cards[:total_players * hand_size]
 
-        # Deal round-robin
-        i = 0
-        while i < len(dealt):
-            for p in self.players_list:
-                if i >= len(dealt):
-                    break
-                self.hands[p].append(dealt[i])
-                i += 1
+        # Deal round-robin: player i gets cards i, i + n, i + 2n, ...
+        for pi, p in enumerate(self.players_list):
+            for card in dealt[pi::total_players]:
+                self._give_card(p, card)
 
         # Start discard with a valid top card and apply start effects
         self.game_stack: List[Card] = []
+        self._top_card: Optional[Card] = None
         self._start_discard_with_valid_card()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['notify']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.notify = Notification(self.room)
+
     def remove_player(self, player) -> None:
         self.players.remove(player)
         self.players_list = [p for p in self.players_list if p != player]
+        self._build_next_table()
+        self.players_by_id.pop(player.id, None)
 
     def validate_players(self) -> None:
         if len(self.players) < self.MIN_PLAYERS_ALLOWED:
@@ -129,22 +169,23 @@ class Game:
 
     def get_state(self) -> Tuple[DefaultDict[Player, List[Card]], Card, str, Optional[str], int, Optional[str]]:
         self.validate_players()
-        top_card = self.get_top_card()
+        top_card = self._top_card
         current_player_id = self.players_list[self.current_index].id
         pending_for_id = None
         if self.pending_draw_for_index is not None:
             pending_for_id = self.players_list[self.pending_draw_for_index].id
-        return (self.hands, top_card, current_player_id, self.current_color, self.pending_draw_count, pending_for_id)
+        current_color = None
+        if self.current_color_idx is not None:
+            current_color = Card.COLOR_NAMES[self.current_color_idx]
+        return (self.hands, top_card, current_player_id, current_color, self.pending_draw_count, pending_for_id)
 
     def get_top_card(self) -> Card:
-        return self.game_stack[-1]
+        return self._top_card
 
     def transfer_played_cards(self) -> None:
-        played_cards = self.game_stack[::]
-        played_cards.pop()
-        random.shuffle(played_cards)
-        self.remaining_cards = played_cards[::]
-        self.game_stack = [self.get_top_card()]
+        self.remaining_cards = self.game_stack[:-1]
+        random.shuffle(self.remaining_cards)
+        self.game_stack = [self._top_card]
 
     def draw(self, player_id: str) -> None:
         self.validate_players()
@@ -153,7 +194,7 @@ class Game:
             self.notify.error('not your turn')
             return
 
-        player = self.find_object(self.players, player_id)
+        player = self.players_by_id[player_id]
         player_cards = self.hands[player]
 
         if not self.remaining_cards:
@@ -163,7 +204,7 @@ class Game:
             return
 
         new_card = self.remaining_cards.pop()
-        player_cards.append(new_card)
+        self._give_card(player, new_card)
 
         # Handle pending draw penalties countdown and turn advance when satisfied
         if self.pending_draw_count > 0 and self.pending_draw_for_index == self.current_index:
@@ -175,8 +216,7 @@ class Game:
                 self._advance_turn(1)
         else:
             # Voluntary draw: if the drawn card cannot be played, pass turn immediately
-            top_card = self.get_top_card()
-            if not self._can_play_card(new_card, top_card):
+            if not self._can_play_card(new_card, self._top_card):
                 self._advance_turn(1)
 
     def play(self, player_id: str, card_id: str, on_game_over: Callable[[GameOverReason, Any], None], chosen_color: Optional[str] = None, uno_called: bool = False) -> None:
@@ -191,33 +231,31 @@ class Game:
             self.notify.error(f'must draw {self.pending_draw_count} card(s) before playing')
             return
 
-        player = self.find_object(self.players, player_id)
+        player = self.players_by_id[player_id]
         player_cards = self.hands[player]
-        card = self.find_object(player_cards, card_id)
-        top_card = self.get_top_card()
+        idx, card = self._find_card(player_cards, card_id)
 
-        if not self._can_play_card(card, top_card):
+        if not self._can_play_card(card, self._top_card):
             self.notify.error('cannot play this card')
             return
 
         if card.is_draw_four():
-            if self.current_color is not None and any(c.color == self.current_color for c in player_cards if not c.is_black()):
+            if self.current_color_idx is not None and self.color_counts[player][self.current_color_idx] > 0:
                 self.notify.error('cannot play draw four when you have a card of the current color')
                 return
 
         # Remove and place on discard
-        idx = self.find_object_idx(player_cards, card.id)
-        player_cards.pop(idx)
-        self.game_stack.append(card)
+        self._take_card(player, idx)
+        self._push_top(card)
 
         # Update current color
         if card.is_black():
             if chosen_color not in Deck.COLORS:
                 self.notify.error('please choose a color to play a wild card')
                 return
-            self.current_color = chosen_color
+            self.current_color_idx = Card.COLOR_IDX[chosen_color]
         else:
-            self.current_color = card.color
+            self.current_color_idx = card.cidx
 
         # UNO penalty
         if len(player_cards) == 1 and not uno_called:
@@ -255,29 +293,27 @@ class Game:
 
         self._advance_turn(steps)
 
-    def find_object(self, objects, obj_id: str):
-        objects = list(objects)
-        idx = self.find_object_idx(objects, obj_id)
-        return objects[idx]
-
-    def find_object_idx(self, objects, obj_id: str):
-        return [obj.id for obj in objects].index(obj_id)
-
     # Helpers
+    def _find_card(self, cards: List[Card], card_id: str) -> Tuple[int, Card]:
+        for i, c in enumerate(cards):
+            if c.id == card_id:
+                return i, c
+        raise ValueError(f'{card_id} is not in hand')
+
     def _start_discard_with_valid_card(self):
         while True:
             if not self.remaining_cards:
                 self.transfer_played_cards()
             card = self.remaining_cards.pop()
             if card.is_draw_four():
-                self.remaining_cards.insert(0, card)
-                random.shuffle(self.remaining_cards)
+                # Put it back at a random position; the rest of the pile is already shuffled
+                self.remaining_cards.insert(random.randint(0, len(self.remaining_cards)), card)
                 continue
-            self.game_stack.append(card)
+            self._push_top(card)
             if card.is_black():
-                self.current_color = random.choice(Deck.COLORS)
+                self.current_color_idx = Card.COLOR_IDX[random.choice(Deck.COLORS)]
             else:
-                self.current_color = card.color
+                self.current_color_idx = card.cidx
 
             if card.value == 'skip':
                 self._advance_turn(2)
@@ -294,12 +330,23 @@ class Game:
                 self._advance_turn(1)
             break
 
+    def _push_top(self, card: Card) -> None:
+        self.game_stack.append(card)
+        self._top_card = card
+
+    def _build_next_table(self) -> None:
+        # _next_table[dir_idx][index][steps] -> next index, for direction +1 (0) and -1 (1)
+        n = len(self.players_list)
+        self._next_table: List[List[List[int]]] = [
+            [[(i + steps * direction) % n for steps in range(self.MAX_TURN_STEPS + 1)] for i in range(n)]
+            for direction in (1, -1)
+        ]
+
     def _advance_turn(self, steps: int = 1):
         self.current_index = self._next_index(steps)
 
     def _next_index(self, steps: int = 1) -> int:
-        n = len(self.players_list)
-        return (self.current_index + steps * self.direction) % n
+        return self._next_table[self.direction < 0][self.current_index][steps]
 
     def _draw_n(self, player: Player, n: int):
         for _ in range(n):
@@ -307,27 +354,25 @@ class Game:
                 self.transfer_played_cards()
             if not self.remaining_cards:
                 return
-            self.hands[player].append(self.remaining_cards.pop())
+            self._give_card(player, self.remaining_cards.pop())
 
     def _can_play_card(self, card: Card, top_card: Card) -> bool:
-        if self.current_color:
-            if card.is_black():
-                return True
-            return card.color == self.current_color or card.value == top_card.value
-        if top_card.is_black():
+        if self.current_color_idx is not None:
+            return card.black or card.cidx == self.current_color_idx or card.vidx == top_card.vidx
+        if top_card.black:
             return True
-        return card.is_black() or card.color == top_card.color or card.value == top_card.value
+        return card.black or card.cidx == top_card.cidx or card.vidx == top_card.vidx
+
+    def _give_card(self, player: Player, card: Card) -> None:
+        self.hands[player].append(card)
+        self.color_counts[player][card.cidx] += 1
+        self.score_accum[player] += card.points
+
+    def _take_card(self, player: Player, idx: int) -> Card:
+        card = self.hands[player].pop(idx)
+        self.color_counts[player][card.cidx] -= 1
+        self.score_accum[player] -= card.points
+        return card
 
     def _calculate_score(self, exclude_player: Player) -> int:
-        total = 0
-        for p in self.players_list:
-            if p == exclude_player:
-                continue
-            for c in self.hands[p]:
-                if c.value.isdigit():
-                    total += int(c.value)
-                elif c.value in ('draw-two', 'reverse', 'skip'):
-                    total += 20
-                elif c.is_black():
-                    total += 50
-        return total
+        return sum(self.score_accum[p] for p in self.players_list if p != exclude_player)
@@ -7,4 +7,4 @@ load_dotenv()
 ENVIRONMENT = os.getenv("ENVIRONMENT") or 'development'
 WEB_URL = os.getenv("WEB_URL") or 'http://localhost:3000'
 # Optional: comma-separated list of allowed frontend origins
-WEB_URLS = [u.strip() for u in os.getenv("WEB_URLS", "").split(",") if u.strip()]
+WEB_URLS = frozenset(u.strip() for u in os.getenv("WEB_URLS", "").split(",") if u.strip())
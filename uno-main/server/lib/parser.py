@@ -18,32 +18,17 @@ def parse_data_args(data: Dict[str, Any], args: List[str]) -> List[Any]:
 
 
 def parse_object(obj) -> Any:
-    return obj.__dict__
+    # Prefer a precomputed serialized form (see Card) over the raw attributes
+    return getattr(obj, '_dict', None) or obj.__dict__
 
 
 def parse_object_list(objects) -> List[Any]:
-    return [obj.__dict__ for obj in list(objects)]
+    return [getattr(obj, '_dict', None) or obj.__dict__ for obj in objects]
 
 
 def parse_game_state(state) -> Dict[str, Any]:
-    # New tuple: (hands, top_card, current_player_id, current_color, pending_draw_count, pending_for_player_id)
-    if len(state) >= 6:
-        hands, top_card, current_player_id, current_color, pending_draw_count, pending_for_player_id = state
-    elif len(state) == 4:
-        hands, top_card, current_player_id, current_color = state
-        pending_draw_count = 0
-        pending_for_player_id = None
-    elif len(state) == 3:
-        hands, top_card, current_player_id = state
-        current_color = None
-        pending_draw_count = 0
-        pending_for_player_id = None
-    else:
-        hands, top_card = state
-        current_player_id = None
-        current_color = None
-        pending_draw_count = 0
-        pending_for_player_id = None
+    # (hands, top_card, current_player_id, current_color, pending_draw_count, pending_for_player_id)
+    hands, top_card, current_player_id, current_color, pending_draw_count, pending_for_player_id = state
     parsed_hands = {key.id: parse_object_list(value) for key, value in hands.items()}
     parsed_top_card = parse_object(top_card)
     result = {
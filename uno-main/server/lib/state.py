@@ -1,7 +1,7 @@
 import logging
 import pickle
 import sqlite3
-from typing import Optional, Set, Tuple
+from typing import Dict, Optional, Set, Tuple
 
 from core.uno import Game, Player
 
@@ -11,20 +11,33 @@ log.setLevel(logging.INFO)
 GAME_EXPIRATION_TIME = 86_400  # 1 day
 ROOM_EXPIRATION_TIME = 86_400  # 1 day
 
+# SQL is kept constant so sqlite3's per-connection statement cache can reuse it
+UPSERT_GAME_SQL = 'REPLACE INTO games (room, data, expires_at) VALUES (?, ?, ?)'
+UPSERT_PLAYERS_SQL = 'REPLACE INTO players (room, data, expires_at) VALUES (?, ?, ?)'
+SELECT_GAME_SQL = 'SELECT data FROM games WHERE room=?'
+SELECT_PLAYERS_SQL = 'SELECT data FROM players WHERE room=?'
+
 
 class State:
     def __init__(self, db_path=':memory:'):
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Write-through caches of unpickled rows, so hot reads skip pickle.loads
+        self._game_cache: Dict[str, Optional[Game]] = {}
+        self._players_cache: Dict[str, Set[Player]] = {}
         self._init_db()
 
     def _init_db(self):
-        c = self.conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS games (
+        # WAL + NORMAL sync avoids an fsync on every commit
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA mmap_size=268435456')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS games (
             room TEXT PRIMARY KEY,
             data BLOB,
             expires_at INTEGER
         )''')
-        c.execute('''CREATE TABLE IF NOT EXISTS players (
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS players (
             room TEXT PRIMARY KEY,
             data BLOB,
             expires_at INTEGER
@@ -65,73 +78,70 @@ class State:
         return (True, None)
 
     def _exists_players(self, room: str) -> bool:
-        c = self.conn.cursor()
-        c.execute('SELECT 1 FROM players WHERE room=?', (room,))
-        return c.fetchone() is not None
+        return self.conn.execute('SELECT 1 FROM players WHERE room=?', (room,)).fetchone() is not None
 
     def get_game_by_room(self, room: str) -> Optional[Game]:
-        c = self.conn.cursor()
-        c.execute('SELECT data FROM games WHERE room=?', (room,))
-        row = c.fetchone()
+        if room in self._game_cache:
+            return self._game_cache[room]
+        row = self.conn.execute(SELECT_GAME_SQL, (room,)).fetchone()
         if not row:
             return None
-        return pickle.loads(row[0])
+        game = pickle.loads(row[0])
+        self._game_cache[room] = game
+        return game
 
     def add_game_to_room(self, room: str, game: Game) -> None:
-        obj = pickle.dumps(game)
-        c = self.conn.cursor()
-        c.execute('REPLACE INTO games (room, data, expires_at) VALUES (?, ?, ?)',
-                  (room, obj, None))
+        obj = pickle.dumps(game, pickle.HIGHEST_PROTOCOL)
+        self.conn.execute(UPSERT_GAME_SQL, (room, obj, None))
         self.conn.commit()
+        self._game_cache[room] = game
 
     def update_game_in_room(self, room: str, game: Game) -> None:
         self.add_game_to_room(room, game)
 
     def get_players_by_room(self, room: str) -> Set[Player]:
-        c = self.conn.cursor()
-        c.execute('SELECT data FROM players WHERE room=?', (room,))
-        row = c.fetchone()
+        if room in self._players_cache:
+            return self._players_cache[room]
+        row = self.conn.execute(SELECT_PLAYERS_SQL, (room,)).fetchone()
         if not row:
             return set()
-        return pickle.loads(row[0])
+        players = pickle.loads(row[0])
+        self._players_cache[room] = players
+        return players
 
     def add_player_to_room(self, room: str, player: Player) -> None:
         log.info(f"adding player {player} to room {room}")
         players = self.get_players_by_room(room)
         players.add(player)
-        obj = pickle.dumps(players)
-        c = self.conn.cursor()
-        c.execute('REPLACE INTO players (room, data, expires_at) VALUES (?, ?, ?)',
-                  (room, obj, None))
+        obj = pickle.dumps(players, pickle.HIGHEST_PROTOCOL)
+        self.conn.execute(UPSERT_PLAYERS_SQL, (room, obj, None))
         self.conn.commit()
+        self._players_cache[room] = players
 
     def remove_player_from_room(self, room: str, player: Player) -> None:
         log.info(f"removing player {player} from room {room}")
         players = self.get_players_by_room(room)
         players.remove(player)
-        obj = pickle.dumps(players)
-        c = self.conn.cursor()
-        c.execute('REPLACE INTO players (room, data, expires_at) VALUES (?, ?, ?)',
-                  (room, obj, None))
+        obj = pickle.dumps(players, pickle.HIGHEST_PROTOCOL)
+        self.conn.execute(UPSERT_PLAYERS_SQL, (room, obj, None))
         self.conn.commit()
+        self._players_cache[room] = players
 
     def delete_all(self, room: str) -> None:
         self.delete_room(room)
         self.delete_game(room)
 
     def delete_room(self, room: str) -> None:
-        c = self.conn.cursor()
-        c.execute('DELETE FROM players WHERE room=?', (room,))
+        self.conn.execute('DELETE FROM players WHERE room=?', (room,))
         self.conn.commit()
+        self._players_cache.pop(room, None)
         log.info(f"deleted {room}")
 
     def delete_game(self, room: str) -> None:
-        c = self.conn.cursor()
-        c.execute('DELETE FROM games WHERE room=?', (room,))
+        self.conn.execute('DELETE FROM games WHERE room=?', (room,))
         self.conn.commit()
+        self._game_cache.pop(room, None)
         log.info(f"deleted game for room {room}")
 
     def list_rooms(self) -> list:
-        c = self.conn.cursor()
-        c.execute('SELECT room FROM players')
-        return [row[0] for row in c.fetchall()]
+        return [row[0] for row in self.conn.execute('SELECT room FROM players')]